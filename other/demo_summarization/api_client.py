@@ -2,26 +2,27 @@
 """
 API Client for Behavioral Signals API
 
-This module contains the necessary functions from send_data_to_api.py
-to work with the Behavioral Signals API.
+This module contains async versions of the necessary functions from
+send_data_to_api.py to work with the Behavioral Signals API.
 """
 
 import os
 import json
+import functools
+import mimetypes
 import time
-import requests
-import sys
+import random
+import asyncio
+import httpx
+import orjson
 
-# Add root directory to path to import feature_extraction
-root_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
-sys.path.insert(0, root_dir)
-
-# Import feature extraction function
+# Import feature extraction function (installed from the repo root with `pip install -e ../..`)
 from feature_extraction import extract_segment_features
 
 # Load configuration from the root directory
+@functools.lru_cache(maxsize=1)
 def load_api_config():
-    """Load API configuration from the root directory"""
+    """Load API configuration from the root directory (read once, then cached)"""
     # Get the root directory (two levels up from this file)
     root_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
     config_file = os.path.join(root_dir, 'api.config')
@@ -40,6 +41,9 @@ API_TOKEN = config["api_token"]
 
 # Constants
 REALTIME_RATIO = 10
+POLL_BASE_DELAY = 0.5
+POLL_MAX_DELAY = 8.0
+POLL_MAX_FAILURES = 5
 BASE_URL = "https://api.behavioralsignals.com/v5"
 
 # API endpoints
@@ -50,7 +54,16 @@ HEADERS = {
     "X-Auth-Token": API_TOKEN
 }
 
-def send_audio_file(file_path, file_name):
+# Shared async HTTP client so upload, polling and results calls reuse keep-alive connections;
+# HTTP/2 lets concurrent jobs multiplex their polls over a single TLS connection
+CLIENT = httpx.AsyncClient(
+    http2=True,
+    headers=HEADERS,
+    timeout=60.0,
+    limits=httpx.Limits(max_connections=20, max_keepalive_connections=20)
+)
+
+async def send_audio_file(file_path, file_name):
     """
     Upload an audio file to the API.
     
@@ -63,23 +76,24 @@ def send_audio_file(file_path, file_name):
     """
     try:
         with open(file_path, "rb") as audio_file:
+            # httpx streams file objects in chunks instead of buffering the whole body
+            content_type = mimetypes.guess_type(file_path)[0] or "application/octet-stream"
             files = {
-                "file": audio_file,
-                "name": (None, file_name)
+                "file": (os.path.basename(file_path), audio_file, content_type)
             }
-            response = requests.post(UPLOAD_URL, headers=HEADERS, files=files)
+            response = await CLIENT.post(UPLOAD_URL, data={"name": file_name}, files=files)
         
         response.raise_for_status()
         print("Upload successful!")
-        return response.json()
-    except requests.exceptions.RequestException as e:
+        return orjson.loads(response.content)
+    except httpx.HTTPError as e:
         print(f"Failed to upload: {e}")
-        if hasattr(e, 'response') and e.response:
+        if isinstance(e, httpx.HTTPStatusError):
             print(f"Status code: {e.response.status_code}")
             print(f"Error message: {e.response.text}")
         return None
 
-def check_process(process_id, client_id):
+async def check_process(process_id, client_id):
     """
     Check the status of a processing job.
     
@@ -89,12 +103,16 @@ def check_process(process_id, client_id):
         
     Returns:
         dict: JSON response with process status
+        
+    Raises:
+        httpx.HTTPError: If the request fails or returns an error status
     """
     process_url = f"{BASE_URL}/clients/{client_id}/processes/{process_id}"
-    response = requests.get(process_url, headers=HEADERS)
-    return response.json()
+    response = await CLIENT.get(process_url)
+    response.raise_for_status()
+    return orjson.loads(response.content)
 
-def send_audio_and_get_response(file_path, file_name):
+async def send_audio_and_get_response(file_path, file_name):
     """
     Send an audio file to the API, monitor processing, and get results.
     
@@ -104,9 +122,12 @@ def send_audio_and_get_response(file_path, file_name):
         
     Returns:
         tuple: (response_dict, audio_duration, processing_time) or (None, 0, 0) if processing failed
+        
+    Raises:
+        httpx.HTTPError: If polling fails with a 4xx status or keeps failing
     """
     print("Sending audio file to API...")
-    upload_response = send_audio_file(file_path, file_name)
+    upload_response = await send_audio_file(file_path, file_name)
     
     if not upload_response:
         return None, 0, 0
@@ -114,14 +135,33 @@ def send_audio_and_get_response(file_path, file_name):
     print("Processing audio file:")
     start_time = time.time()
     
+    # Exponential backoff: reset on status change, double while nothing changes
+    delay = POLL_BASE_DELAY
+    last_status = None
+    failures = 0
+    
     while True:
-        process_response = check_process(upload_response["pid"], PROJECT_ID)
+        try:
+            process_response = await check_process(upload_response["pid"], PROJECT_ID)
+        except httpx.HTTPError as e:
+            # Only network errors and 5xx are transient; 4xx (bad token, unknown pid) never recover
+            client_error = isinstance(e, httpx.HTTPStatusError) and e.response.status_code < 500
+            failures += 1
+            if client_error or failures >= POLL_MAX_FAILURES:
+                raise
+            print(f"Polling failed ({e}), retrying...")
+            delay = min(POLL_MAX_DELAY, delay * 2)
+            await asyncio.sleep(random.uniform(0, delay))
+            continue
+        failures = 0
+        
+        status = process_response["status"]
         
         # Status 2 means processing is complete
-        if process_response["status"] == 2:
+        if status == 2:
             break
         # Status 1 means processing is in progress
-        elif process_response["status"] == 1:
+        elif status == 1:
             current_time = time.time()
             duration = process_response["duration"]
             elapsed = current_time - start_time
@@ -129,10 +169,17 @@ def send_audio_and_get_response(file_path, file_name):
             # Calculate progress percentage
             percentage_processed = min(1.0, elapsed * REALTIME_RATIO / duration)
             print(f"Please wait... {100 * percentage_processed:.1f}% completed", end="\r")
-        elif process_response["status"] == 0: # API busy with another job:
+        elif status == 0: # API busy with another job:
             print("API is busy, waiting...")
-            
-        time.sleep(0.5)
+        
+        if status != last_status:
+            delay = POLL_BASE_DELAY
+        else:
+            delay = min(POLL_MAX_DELAY, delay * 2)
+        last_status = status
+        
+        # Full jitter keeps concurrent clients from polling in lockstep
+        await asyncio.sleep(random.uniform(0, delay))
     
     end_time = time.time()
     processing_time = end_time - start_time
@@ -147,9 +194,14 @@ def send_audio_and_get_response(file_path, file_name):
 
     # Get the results
     results_url = f"{BASE_URL}/clients/{PROJECT_ID}/processes/{process_response['pid']}/results"
-    results_response = requests.get(results_url, headers=HEADERS)
+    try:
+        results_response = await CLIENT.get(results_url)
+        results_response.raise_for_status()
+    except httpx.HTTPError as e:
+        print(f"Failed to fetch results: {e}")
+        return None, 0, 0
     
-    response_json = results_response.json()
+    response_json = orjson.loads(results_response.content)
     
     # Extract audio duration from results (find maximum endTime)
     audio_duration = 0.0
@@ -6,23 +6,30 @@ This backend handles audio file uploads, processes them using the Behavioral Sig
 and generates summaries using ChatGPT.
 """
 
+import io
 import os
 import json
+import functools
+import hashlib
+import asyncio
 import tempfile
 import shutil
 from pathlib import Path
-from typing import Optional
+from collections import OrderedDict
+from typing import AsyncIterator, Optional, Tuple
 
 from fastapi import FastAPI, File, UploadFile, HTTPException
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import ORJSONResponse, StreamingResponse
+import numpy as np
 import openai
-from pydub import AudioSegment
+import orjson
 
 # Import the API client functionality
-from api_client import send_audio_and_get_response, extract_segment_features
+from api_client import CLIENT, send_audio_and_get_response, extract_segment_features
 
-app = FastAPI(title="Audio Analysis Summarization API")
+app = FastAPI(title="Audio Analysis Summarization API", default_response_class=ORJSONResponse)
 
 # Add CORS middleware
 app.add_middleware(
@@ -36,8 +43,40 @@ app.add_middleware(
 # Load configuration
 CONFIG_FILE = os.path.join(os.path.dirname(__file__), "config.json")
 
+# On-disk cache of API results and summaries, keyed by audio content hash
+CACHE_DIR = Path(tempfile.gettempdir()) / "bsi_cache"
+
+# Bump whenever the ChatGPT prompt changes so stale cached summaries are ignored
+PROMPT_VERSION = "3"
+
+# In-memory LRU of generated summaries, keyed by (analysis text digest, model)
+SUMMARY_CACHE: "OrderedDict[Tuple[str, str], str]" = OrderedDict()
+SUMMARY_CACHE_SIZE = 128
+
+# Only the most informative segments are detailed in the prompt, to bound its length
+MAX_PROMPT_SEGMENTS = 50
+
+# ChatGPT prompt, built once at import time
+SYSTEM_MESSAGE = {
+    "role": "system",
+    "content": "You are an expert audio analyst who provides clear, insightful summaries of speech analysis data."
+}
+
+PROMPT_TEMPLATE = """Please analyze the following audio analysis results and provide a comprehensive summary. 
+Focus on the key insights about the speaker's emotional state, speaking patterns, and overall characteristics:
+
+{analysis_text}
+
+Please provide a clear, concise summary that highlights:
+1. The main emotional tone and sentiment
+2. Turn taking, speaker attributes and interaction dynamics: use the durations of each utterance of each speaker to assess the turn taking and interaction dynamics. Who speaks more, who interrupts, how long does each speaker speak, speaking rate, etc.
+3. Overall asseessment of the subject under discussion and the main topics discussed
+
+Summary:"""
+
+@functools.lru_cache(maxsize=1)
 def load_config():
-    """Load configuration from config.json"""
+    """Load configuration from config.json (read once, then cached)"""
     try:
         with open(CONFIG_FILE, 'r') as f:
             config = json.load(f)
@@ -45,9 +84,75 @@ def load_config():
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to load config: {str(e)}")
 
-def convert_to_wav(input_file_path: str, output_file_path: str) -> bool:
+def file_sha256(file_path: str) -> str:
+    """Compute the SHA-256 hex digest of a file, reading it in 1MB chunks."""
+    digest = hashlib.sha256()
+    with open(file_path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def read_cache(key: str) -> Optional[dict]:
+    """Return the cached entry for key, or None if it is missing or unreadable."""
+    try:
+        with open(CACHE_DIR / f"{key}.json", "rb") as f:
+            return orjson.loads(f.read())
+    except (OSError, ValueError):
+        return None
+
+def write_cache(key: str, data: dict) -> None:
+    """Atomically write a cache entry (temp file + rename) so readers never see partial JSON."""
+    try:
+        CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=CACHE_DIR, suffix=".tmp")
+        with os.fdopen(fd, "wb") as f:
+            f.write(orjson.dumps(data))
+        os.replace(tmp_path, CACHE_DIR / f"{key}.json")
+    except OSError as e:
+        print(f"Failed to write cache entry {key}: {e}")
+
+def save_upload(src, dst) -> None:
     """
-    Convert audio file to WAV format using pydub.
+    Copy an uploaded file to disk.
+    
+    Uses os.sendfile for a kernel-space copy when the upload has been spooled to a
+    real file, and falls back to a buffered copy with 1MB chunks otherwise.
+    
+    Args:
+        src: Source file object (UploadFile.file)
+        dst: Destination file object opened in binary write mode
+    """
+    # SpooledTemporaryFile keeps small uploads in a BytesIO; calling its fileno()
+    # would force a rollover to disk, so inspect the underlying file instead
+    raw = getattr(src, "_file", src)
+    start = src.tell()
+    if hasattr(os, "sendfile"):
+        try:
+            in_fd = raw.fileno()
+            offset = start
+            remaining = os.fstat(in_fd).st_size - offset
+            dst.flush()
+            out_fd = dst.fileno()
+            while remaining > 0:
+                sent = os.sendfile(out_fd, in_fd, offset, remaining)
+                if sent == 0:
+                    break
+                offset += sent
+                remaining -= sent
+            return
+        except (AttributeError, io.UnsupportedOperation, OSError):
+            # Not backed by a real file (or sendfile unsupported here); rewind any partial copy
+            src.seek(start)
+            dst.seek(0)
+            dst.truncate()
+    shutil.copyfileobj(src, dst, length=1 << 20)
+
+async def convert_to_wav(input_file_path: str, output_file_path: str) -> bool:
+    """
+    Convert audio file to WAV format using ffmpeg.
+    
+    ffmpeg streams the decode/encode itself, so the samples never pass through Python,
+    and it runs as an async subprocess so the worker keeps serving other requests.
     
     Args:
         input_file_path (str): Path to input audio file
@@ -57,20 +162,56 @@ def convert_to_wav(input_file_path: str, output_file_path: str) -> bool:
         bool: True if successful, False otherwise
     """
     try:
-        # Load audio file
-        audio = AudioSegment.from_file(input_file_path)
-        
-        # Export as WAV
-        audio.export(output_file_path, format="wav")
+        proc = await asyncio.create_subprocess_exec(
+            "ffmpeg", "-y", "-i", input_file_path, "-f", "wav", "-acodec", "pcm_s16le", output_file_path,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE
+        )
+        _, stderr = await proc.communicate()
+        if proc.returncode != 0:
+            print(f"Error converting audio: {stderr.decode(errors='replace')}")
+            return False
         return True
     except Exception as e:
         print(f"Error converting audio: {e}")
         return False
 
+# "%s: %.2f" % (label, score), bound once and mapped over dict items
+_POSTERIOR_FORMAT = "%s: %.2f".__mod__
+
+def format_posteriors(posteriors: dict) -> str:
+    """Format a label -> posterior dict as "label: 0.12, other: 0.34"."""
+    return ", ".join(map(_POSTERIOR_FORMAT, posteriors.items()))
+
+def mean_posteriors(segments: list, key: str) -> dict:
+    """
+    Average a per-segment posterior dict (e.g. emotion_posteriors) over all segments.
+    
+    Labels missing from a segment are ignored rather than counted as zero.
+    
+    Args:
+        segments (list): List of processed segment features
+        key (str): Name of the posterior dict in each segment
+        
+    Returns:
+        dict: Label -> mean posterior, in first-seen label order
+    """
+    posteriors = [segment.get(key) or {} for segment in segments]
+    labels = list(dict.fromkeys(label for p in posteriors for label in p))
+    if not labels:
+        return {}
+    
+    matrix = np.array([[p.get(label, np.nan) for label in labels] for p in posteriors], dtype=float)
+    return dict(zip(labels, np.nanmean(matrix, axis=0).tolist()))
+
 def format_features_for_gpt(segments: list) -> str:
     """
     Format the processed segment features for ChatGPT analysis.
     
+    The text opens with recording-level statistics, followed by per-segment details
+    for at most MAX_PROMPT_SEGMENTS segments, picked by peak emotion posterior times
+    duration and listed in chronological order.
+    
     Args:
         segments (list): List of processed segment features
         
@@ -80,111 +221,192 @@ def format_features_for_gpt(segments: list) -> str:
     if not segments:
         return "No analysis results available."
     
-    formatted_text = "Audio Analysis Summary:\n\n"
+    parts = ["Audio Analysis Summary:\n\n"]
+    append = parts.append
     
-    for i, segment in enumerate(segments, 1):
-        formatted_text += f"Segment {i} ({segment['startTime']}s - {segment['endTime']}s):\n"
+    # Recording-level aggregates, computed in one vectorized pass
+    starts = np.array([float(segment['startTime']) for segment in segments])
+    ends = np.array([float(segment['endTime']) for segment in segments])
+    durations = np.clip(ends - starts, 0.0, None)
+    total_duration = durations.sum()
+    
+    speakers, speaker_index = np.unique(
+        [segment.get('speaker_ID') or "unknown" for segment in segments],
+        return_inverse=True
+    )
+    talk_time = np.bincount(speaker_index, weights=durations, minlength=len(speakers))
+    
+    append("Global statistics:\n")
+    append(f"  Total speech duration: {total_duration:.1f}s across {len(segments)} segments\n")
+    if total_duration > 0:
+        shares = ", ".join(
+            f"{speaker} {100 * seconds / total_duration:.1f}%"
+            for speaker, seconds in zip(speakers.tolist(), talk_time.tolist())
+        )
+        append(f"  Talk time: {shares}\n")
+    mean_emotions = mean_posteriors(segments, 'emotion_posteriors')
+    if mean_emotions:
+        append(f"  Mean emotions: {format_posteriors(mean_emotions)}\n")
+    append("\n")
+    
+    # Keep the top-K segments by emotional intensity weighted by length
+    if len(segments) > MAX_PROMPT_SEGMENTS:
+        peak_emotion = np.array([
+            max((segment.get('emotion_posteriors') or {}).values(), default=0.0)
+            for segment in segments
+        ])
+        selected = np.sort(np.argsort(-(peak_emotion * durations), kind="stable")[:MAX_PROMPT_SEGMENTS]).tolist()
+        append(f"Showing the {MAX_PROMPT_SEGMENTS} most informative of {len(segments)} segments:\n\n")
+    else:
+        selected = range(len(segments))
+    
+    rates = np.array([
+        np.nan if segment.get('speaking_rate') is None else segment['speaking_rate']
+        for segment in segments
+    ], dtype=float)
+    rate_descs = np.where(rates > 0.1, "fast", np.where(rates < -0.1, "slow", "normal")).tolist()
+    
+    for index in selected:
+        segment = segments[index]
+        rate_desc = rate_descs[index]
+        g = segment.get
+        append(f"Segment {index + 1} ({segment['startTime']}s - {segment['endTime']}s):\n")
         
         # Transcription
-        if segment.get('transcription'):
-            formatted_text += f"  Transcript: {segment['transcription']}\n"
+        if g('transcription'):
+            append(f"  Transcript: {segment['transcription']}\n")
         
         # Speaker and language info
-        if segment.get('speaker_ID'):
-            formatted_text += f"  Speaker: {segment['speaker_ID']}\n"
-        if segment.get('language'):
-            formatted_text += f"  Language: {segment['language']} (confidence: {segment.get('language_posterior', 'N/A'):.2f})\n"
+        if g('speaker_ID'):
+            append(f"  Speaker: {segment['speaker_ID']}\n")
+        if g('language'):
+            append(f"  Language: {segment['language']} (confidence: {g('language_posterior', 'N/A'):.2f})\n")
         
         # Demographics
-        if segment.get('gender'):
-            formatted_text += f"  Gender: {segment['gender']} (confidence: {segment.get('gender_posterior', 'N/A'):.2f})\n"
-        if segment.get('age_estimate'):
-            formatted_text += f"  Estimated Age: {segment['age_estimate']:.1f} years\n"
+        if g('gender'):
+            append(f"  Gender: {segment['gender']} (confidence: {g('gender_posterior', 'N/A'):.2f})\n")
+        if g('age_estimate'):
+            append(f"  Estimated Age: {segment['age_estimate']:.1f} years\n")
         
         # Emotional characteristics
-        if segment.get('emotion_posteriors'):
-            emotions = ", ".join([f"{emotion}: {score:.2f}" for emotion, score in segment['emotion_posteriors'].items()])
-            formatted_text += f"  Emotions: {emotions}\n"
+        if g('emotion_posteriors'):
+            emotions = format_posteriors(segment['emotion_posteriors'])
+            append(f"  Emotions: {emotions}\n")
         
-        if segment.get('positivity_posteriors'):
-            positivity = ", ".join([f"{pos}: {score:.2f}" for pos, score in segment['positivity_posteriors'].items()])
-            formatted_text += f"  Sentiment: {positivity}\n"
+        if g('positivity_posteriors'):
+            positivity = format_posteriors(segment['positivity_posteriors'])
+            append(f"  Sentiment: {positivity}\n")
         
-        if segment.get('strength_posteriors'):
-            strength = ", ".join([f"{str_type}: {score:.2f}" for str_type, score in segment['strength_posteriors'].items()])
-            formatted_text += f"  Voice Strength: {strength}\n"
+        if g('strength_posteriors'):
+            strength = format_posteriors(segment['strength_posteriors'])
+            append(f"  Voice Strength: {strength}\n")
         
         # Speaking characteristics
-        if segment.get('speaking_rate') is not None:
-            rate_desc = "fast" if segment['speaking_rate'] > 0.1 else "slow" if segment['speaking_rate'] < -0.1 else "normal"
-            formatted_text += f"  Speaking Rate: {rate_desc} (score: {segment['speaking_rate']:.2f})\n"
+        if g('speaking_rate') is not None:
+            append(f"  Speaking Rate: {rate_desc} (score: {segment['speaking_rate']:.2f})\n")
         
-        if segment.get('hesitation_posterior'):
-            formatted_text += f"  Hesitation: {segment['hesitation_posterior']:.2f}\n"
+        if g('hesitation_posterior'):
+            append(f"  Hesitation: {segment['hesitation_posterior']:.2f}\n")
         
         # Authenticity
-        if segment.get('deepfake_posteriors'):
-            deepfake = ", ".join([f"{auth}: {score:.2f}" for auth, score in segment['deepfake_posteriors'].items()])
-            formatted_text += f"  Authenticity: {deepfake}\n"
+        if g('deepfake_posteriors'):
+            deepfake = format_posteriors(segment['deepfake_posteriors'])
+            append(f"  Authenticity: {deepfake}\n")
         
-        formatted_text += "\n"
+        append("\n")
     
-    return formatted_text
+    return "".join(parts)
 
-async def get_chatgpt_summary(analysis_text: str, config: dict) -> str:
+async def get_chatgpt_summary(analysis_text: str, config: dict) -> AsyncIterator[str]:
     """
-    Get summary from ChatGPT API.
+    Stream a summary from the ChatGPT API.
     
     Args:
         analysis_text (str): Formatted analysis text
         config (dict): Configuration containing API key and model
         
-    Returns:
-        str: ChatGPT summary
+    Yields:
+        str: ChatGPT summary text, chunk by chunk as tokens arrive
     """
-    try:
-        # Set up OpenAI client
-        openai.api_key = config['openai_api_key']
-        
-        # Create the prompt
-        prompt = f"""Please analyze the following audio analysis results and provide a comprehensive summary. 
-Focus on the key insights about the speaker's emotional state, speaking patterns, and overall characteristics:
+    model = config.get('model', 'gpt-3.5-turbo')
+    cache_key = (hashlib.blake2b(analysis_text.encode()).hexdigest(), model)
+    
+    summary = SUMMARY_CACHE.get(cache_key)
+    if summary is not None:
+        SUMMARY_CACHE.move_to_end(cache_key)
+        yield summary
+        return
+    
+    # Pass the key per call rather than mutating the global openai.api_key
+    response = await openai.ChatCompletion.acreate(
+        api_key=config['openai_api_key'],
+        model=model,
+        messages=[
+            SYSTEM_MESSAGE,
+            {"role": "user", "content": PROMPT_TEMPLATE.format(analysis_text=analysis_text)}
+        ],
+        max_tokens=500,
+        temperature=0.7,
+        stream=True
+    )
+    
+    parts = []
+    async for chunk in response:
+        content = chunk.choices[0].delta.get("content")
+        if content:
+            parts.append(content)
+            yield content
+    
+    SUMMARY_CACHE[cache_key] = "".join(parts).strip()
+    if len(SUMMARY_CACHE) > SUMMARY_CACHE_SIZE:
+        SUMMARY_CACHE.popitem(last=False)
 
-{analysis_text}
+async def replay_summary(summary: str) -> AsyncIterator[str]:
+    """Yield an already generated summary as a single chunk."""
+    yield summary
 
-Please provide a clear, concise summary that highlights:
-1. The main emotional tone and sentiment
-2. Turn taking, speaker attributes and interaction dynamics: use the durations of each utterance of each speaker to assess the turn taking and interaction dynamics. Who speaks more, who interrupts, how long does each speaker speak, speaking rate, etc.
-3. Overall asseessment of the subject under discussion and the main topics discussed
-
-Summary:"""
+def sse_event(payload: dict) -> bytes:
+    """Encode a payload as a Server-Sent Events data line."""
+    return b"data: " + orjson.dumps(payload) + b"\n\n"
 
-        # Call ChatGPT API
-        response = openai.ChatCompletion.create(
-            model=config.get('model', 'gpt-3.5-turbo'),
-            messages=[
-                {"role": "system", "content": "You are an expert audio analyst who provides clear, insightful summaries of speech analysis data."},
-                {"role": "user", "content": prompt}
-            ],
-            max_tokens=500,
-            temperature=0.7
-        )
-        
-        return response.choices[0].message.content.strip()
-        
+async def stream_analysis(metadata: dict, summary_chunks: AsyncIterator[str], summary_key: Optional[str]) -> AsyncIterator[bytes]:
+    """
+    Stream the analysis results to the client as Server-Sent Events.
+    
+    Emits a "metadata" event with the API results, one "summary" event per
+    summary chunk, and finally either "done" or "error".
+    
+    Args:
+        metadata (dict): Filename, timings and raw analysis data
+        summary_chunks: Async iterator of summary text chunks
+        summary_key (str): Cache key to store the completed summary under, or None to skip caching
+    """
+    yield sse_event({"type": "metadata", **metadata})
+    
+    parts = []
+    try:
+        async for chunk in summary_chunks:
+            parts.append(chunk)
+            yield sse_event({"type": "summary", "content": chunk})
     except Exception as e:
-        raise HTTPException(status_code=500, detail=f"ChatGPT API error: {str(e)}")
+        # Headers are already sent, so report the failure in-band
+        yield sse_event({"type": "error", "detail": f"ChatGPT API error: {str(e)}"})
+        return
+    
+    if summary_key:
+        write_cache(summary_key, {"summary": "".join(parts).strip()})
+    yield sse_event({"type": "done"})
 
 @app.post("/analyze-audio")
 async def analyze_audio(file: UploadFile = File(...)):
     """
-    Analyze uploaded audio file and return ChatGPT summary.
+    Analyze uploaded audio file and stream back the ChatGPT summary.
     
     Args:
         file: Uploaded audio file (WAV or MP3)
         
     Returns:
-        JSON response with analysis summary
+        Server-Sent Events stream with the analysis metadata followed by summary chunks
     """
     # Validate file type
     if not file.filename.lower().endswith(('.wav', '.mp3')):
@@ -196,51 +418,85 @@ async def analyze_audio(file: UploadFile = File(...)):
     # Create temporary directory for processing
     with tempfile.TemporaryDirectory() as temp_dir:
         try:
-            # Save uploaded file
+            # Save uploaded file (disk I/O runs in a thread to keep the event loop free)
             input_file_path = os.path.join(temp_dir, file.filename)
             with open(input_file_path, "wb") as buffer:
-                shutil.copyfileobj(file.file, buffer)
+                await run_in_threadpool(save_upload, file.file, buffer)
             
-            # Convert to WAV if necessary
-            if file.filename.lower().endswith('.mp3'):
-                wav_file_path = os.path.join(temp_dir, "converted.wav")
-                if not convert_to_wav(input_file_path, wav_file_path):
+            # Convert to WAV if necessary (skipped when the API is configured to take MP3 as-is)
+            if file.filename.lower().endswith('.mp3') and not config.get('api_accepts_mp3', False):
+                audio_file_path = os.path.join(temp_dir, "converted.wav")
+                if not await convert_to_wav(input_file_path, audio_file_path):
                     raise HTTPException(status_code=500, detail="Failed to convert MP3 to WAV")
             else:
-                wav_file_path = input_file_path
-            
-            # Process with Behavioral Signals API
-            response_data, audio_duration, processing_time = send_audio_and_get_response(
-                wav_file_path, 
-                os.path.basename(file.filename)
-            )
+                audio_file_path = input_file_path
             
-            if not response_data:
-                raise HTTPException(status_code=500, detail="Failed to process audio with Behavioral Signals API")
+            # Reuse earlier results for identical audio content
+            audio_hash = await run_in_threadpool(file_sha256, audio_file_path)
+            cached = read_cache(audio_hash)
             
-            # Extract processed features
-            segment_features = extract_segment_features(response_data)
+            if cached:
+                response_data = cached["response_data"]
+                audio_duration = cached["audio_duration"]
+                processing_time = cached["processing_time"]
+            else:
+                # Process with Behavioral Signals API
+                response_data, audio_duration, processing_time = await send_audio_and_get_response(
+                    audio_file_path, 
+                    os.path.basename(file.filename)
+                )
+                
+                if not response_data:
+                    raise HTTPException(status_code=500, detail="Failed to process audio with Behavioral Signals API")
+                
+                # Only cache complete results, never an error body
+                if "results" in response_data:
+                    write_cache(audio_hash, {
+                        "response_data": response_data,
+                        "audio_duration": audio_duration,
+                        "processing_time": processing_time
+                    })
             
-            # Format features for ChatGPT
-            formatted_analysis = format_features_for_gpt(segment_features)
+            # Summaries depend on the audio, the prompt and the model
+            model = config.get('model', 'gpt-3.5-turbo')
+            summary_key = hashlib.sha256(f"{audio_hash}{PROMPT_VERSION}{model}".encode()).hexdigest()
+            cached_summary = read_cache(summary_key)
             
-            # Get ChatGPT summary
-            summary = await get_chatgpt_summary(formatted_analysis, config)
+            if cached_summary:
+                summary_chunks = replay_summary(cached_summary["summary"])
+                summary_key = None
+            else:
+                # Extract processed features
+                segment_features = extract_segment_features(response_data)
+                
+                # Format features for ChatGPT
+                formatted_analysis = format_features_for_gpt(segment_features)
+                
+                # Stream ChatGPT summary tokens as they are generated
+                summary_chunks = get_chatgpt_summary(formatted_analysis, config)
             
-            return JSONResponse(content={
+            metadata = {
                 "success": True,
                 "filename": file.filename,
                 "audio_duration": audio_duration,
                 "processing_time": processing_time,
-                "summary": summary,
                 "raw_analysis": response_data
-            })
+            }
+            return StreamingResponse(
+                stream_analysis(metadata, summary_chunks, summary_key),
+                media_type="text/event-stream"
+            )
             
         except HTTPException:
             raise
         except Exception as e:
             raise HTTPException(status_code=500, detail=f"Processing error: {str(e)}")
 
+@app.on_event("shutdown")
+async def close_api_client():
+    """Close the shared Behavioral Signals HTTP client"""
+    await CLIENT.aclose()
+
 @app.get("/health")
 async def health_check():
     """Health check endpoint"""
@@ -248,4 +504,12 @@ async def health_check():
 
 if __name__ == "__main__":
     import uvicorn
-    uvicorn.run(app, host="0.0.0.0", port=8000)
+    # Workers need an import string so each process can import the app itself
+    uvicorn.run(
+        "backend:app",
+        host="0.0.0.0",
+        port=8000,
+        workers=max(2, (os.cpu_count() or 2) // 2),
+        loop="uvloop",
+        http="httptools"
+    )
@@ -32,12 +32,13 @@ def check_backend_health():
     except:
         return False
 
-def upload_and_analyze_audio(audio_file):
+def upload_and_analyze_audio(audio_file, summary_placeholder):
     """
-    Upload audio file to backend and get analysis summary.
+    Upload audio file to backend and stream back the analysis summary.
     
     Args:
         audio_file: Streamlit uploaded file object
+        summary_placeholder: Streamlit placeholder updated as summary text arrives
         
     Returns:
         dict: Response from backend or None if failed
@@ -50,14 +51,32 @@ def upload_and_analyze_audio(audio_file):
         response = requests.post(
             f"{BACKEND_URL}/analyze-audio",
             files=files,
+            stream=True,
             timeout=300  # 5 minutes timeout for processing
         )
         
-        if response.status_code == 200:
-            return response.json()
-        else:
+        if response.status_code != 200:
             st.error(f"Backend error: {response.status_code} - {response.text}")
             return None
+        
+        # The backend sends Server-Sent Events: metadata first, then summary chunks
+        results = {"summary": ""}
+        for line in response.iter_lines():
+            if not line.startswith(b"data: "):
+                continue
+            event = json.loads(line[len(b"data: "):])
+            
+            if event["type"] == "metadata":
+                results.update(event)
+            elif event["type"] == "summary":
+                results["summary"] += event["content"]
+                summary_placeholder.markdown(results["summary"])
+            elif event["type"] == "error":
+                st.error(f"Backend error: {event['detail']}")
+                return None
+        
+        results["summary"] = results["summary"].strip()
+        return results
             
     except requests.exceptions.Timeout:
         st.error("Request timed out. The audio file might be too long or the server is busy.")
@@ -172,8 +191,10 @@ def main():
                 status_text.text("Uploading file...")
                 progress_bar.progress(20)
                 
-                # Process the file
-                results = upload_and_analyze_audio(uploaded_file)
+                # Process the file, showing the summary as it is generated
+                summary_placeholder = st.empty()
+                results = upload_and_analyze_audio(uploaded_file, summary_placeholder)
+                summary_placeholder.empty()
                 
                 if results:
                     progress_bar.progress(100)
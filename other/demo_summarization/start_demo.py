@@ -5,7 +5,9 @@ Startup script for the Audio Analysis Summarization Demo
 This script helps start both the backend and frontend servers.
 """
 
+import importlib.util
 import subprocess
+import shutil
 import sys
 import time
 import os
@@ -16,15 +18,15 @@ from pathlib import Path
 def check_dependencies():
     """Check if required dependencies are installed"""
     required_packages = [
-        'fastapi', 'uvicorn', 'streamlit', 'openai', 'pydub', 'requests'
+        'fastapi', 'uvicorn', 'uvloop', 'httptools', 'streamlit', 'openai',
+        'requests', 'httpx', 'h2', 'orjson', 'numpy', 'feature_extraction'
     ]
     
     missing_packages = []
     
+    # find_spec only locates each package, without running its (slow) import-time code
     for package in required_packages:
-        try:
-            __import__(package)
-        except ImportError:
+        if importlib.util.find_spec(package) is None:
             missing_packages.append(package)
     
     if missing_packages:
@@ -33,6 +35,12 @@ def check_dependencies():
             print(f"   - {package}")
         print("\nPlease install dependencies:")
         print("   pip install -r requirements.txt")
+        print("   pip install -e ../..")
+        return False
+    
+    if shutil.which("ffmpeg") is None:
+        print("❌ ffmpeg not found on PATH")
+        print("Please install ffmpeg (needed to convert MP3 uploads)")
         return False
     
     return True
@@ -11,85 +11,110 @@ This script evaluates the performance of deepfake detection by:
 
 # Standard library imports
 import os
+import csv
 import argparse
+import asyncio
+import logging
 import time
 from collections import defaultdict
+from operator import itemgetter
 
 # Third-party imports
 import numpy as np
-from sklearn.metrics import confusion_matrix, classification_report
+from sklearn.metrics import classification_report
 
 # Local imports
 import sys
 import os
 # Add parent directory to path to import modules from parent directory
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-from send_data_to_api import send_audio_and_get_response
+from send_data_to_api import send_audio_and_get_response, list_wav_files, map_files_concurrently, positive_int
 from feature_extraction import extract_segment_features
 
-def process_audio_file(file_path):
+logger = logging.getLogger(__name__)
+
+# Default number of files sent to the API concurrently (kept low to respect rate limits)
+DEFAULT_CONCURRENCY = 4
+
+# Default file the per-file results are streamed to
+DEFAULT_RESULTS_FILE = "results.csv"
+
+# Pulls (spoofed, bonafide) out of a segment's deepfake posteriors
+GET_POSTERIORS = itemgetter("spoofed", "bonafide")
+NO_POSTERIORS = {"spoofed": 0.0, "bonafide": 0.0}
+
+# Below this many segments, averaging in plain Python is faster than with NumPy
+NUMPY_MEAN_MIN_SEGMENTS = 32
+
+async def process_audio_file(session, file_path, refresh_cache=False):
     """
-    Process a single audio file and determine if it's bonafide or spoofed.
+    Process a single audio file and compute its average deepfake posteriors.
     
     Args:
+        session (aiohttp.ClientSession): Session to use for API calls
         file_path (str): Path to the audio file
+        refresh_cache (bool): Ignore any cached API result and re-process the file
         
     Returns:
-        tuple: (is_spoofed, confidence) where is_spoofed is a boolean and
-               confidence is the posterior probability
+        tuple: (avg_spoofed, avg_bonafide) posteriors averaged over all segments,
+               or None if processing failed
     """
-    print(f"\nProcessing: {file_path}")
+    logger.info("Processing: %s", file_path)
     file_name = os.path.basename(file_path)
     
     # Send audio to API and get response
-    response, _, _ = send_audio_and_get_response(file_path, file_name)
+    response, _, _ = await send_audio_and_get_response(session, file_path, file_name, refresh_cache)
     
     if not response:
-        print(f"Failed to process {file_path}")
-        return None, 0.0
+        logger.error("Failed to process %s", file_path)
+        return None
     
     # Extract features from response
     features = extract_segment_features(response)
     
-    # Aggregate deepfake posteriors across all segments
-    spoofed_posteriors = []
-    bonafide_posteriors = []
-    
-    for segment in features:
-        deepfake_posteriors = segment.get("deepfake_posteriors", {})
-        
-        # Extract posteriors for "spoofed" and "bonafide" labels
-        spoofed_posterior = deepfake_posteriors.get("spoofed", 0.0)
-        bonafide_posterior = deepfake_posteriors.get("bonafide", 0.0)
-        
-        spoofed_posteriors.append(spoofed_posterior)
-        bonafide_posteriors.append(bonafide_posterior)
+    # Aggregate deepfake posteriors across all segments as (spoofed, bonafide) pairs
+    try:
+        posteriors = [GET_POSTERIORS(segment.get("deepfake_posteriors") or NO_POSTERIORS) for segment in features]
+    except KeyError:
+        # Some segment reports only one of the labels; count the missing one as 0.0
+        posteriors = [
+            (p.get("spoofed", 0.0), p.get("bonafide", 0.0))
+            for p in (segment.get("deepfake_posteriors") or NO_POSTERIORS for segment in features)
+        ]
+    if not posteriors:
+        return 0.0, 0.0
     
-    # Calculate average posteriors
-    avg_spoofed = np.mean(spoofed_posteriors) if spoofed_posteriors else 0.0
-    avg_bonafide = np.mean(bonafide_posteriors) if bonafide_posteriors else 0.0
+    # Most files have a handful of segments, where plain sum() beats building an array
+    if len(posteriors) < NUMPY_MEAN_MIN_SEGMENTS:
+        spoofed, bonafide = zip(*posteriors)
+        return sum(spoofed) / len(spoofed), sum(bonafide) / len(bonafide)
     
-    # Determine if the file is classified as spoofed
-    is_spoofed = avg_spoofed > avg_bonafide
-    confidence = max(avg_spoofed, avg_bonafide)
+    avg_spoofed, avg_bonafide = np.array(posteriors, dtype=np.float32).mean(axis=0)
     
-    print(f"Classification: {'Spoofed' if is_spoofed else 'Bonafide'} (confidence: {confidence:.4f})")
-    return is_spoofed, confidence
+    return avg_spoofed, avg_bonafide
 
-def evaluate_folder(folder_path):
+async def evaluate_folder(folder_path, concurrency=DEFAULT_CONCURRENCY, refresh_cache=False,
+                          results_file=DEFAULT_RESULTS_FILE, verbose=False):
     """
     Evaluate all audio files in the bonafide and deepfake subfolders.
     
+    Files are sent to the API concurrently, at most `concurrency` at a time.
+    Per-file results are written to a CSV file as each file completes.
+    
     Args:
         folder_path (str): Path to the folder containing bonafide and deepfake subfolders
+        concurrency (int): Maximum number of files processed at the same time
+        refresh_cache (bool): Ignore cached API results and re-process every file
+        results_file (str): CSV file to write the per-file results to
+        verbose (bool): Also print the per-file results table
         
     Returns:
-        tuple: (y_true, y_pred) arrays for confusion matrix calculation
+        tuple: (y_true, y_pred, confidences) arrays for confusion matrix calculation
     """
     # Check if the folder exists
     if not os.path.isdir(folder_path):
         print(f"Error: Folder '{folder_path}' does not exist")
-        return [], []
+        return [], [], []
     
     # Check if bonafide and deepfake subfolders exist
     bonafide_folder = os.path.join(folder_path, "bonafide")
@@ -97,54 +122,76 @@ def evaluate_folder(folder_path):
     
     if not os.path.isdir(bonafide_folder):
         print(f"Error: Bonafide folder '{bonafide_folder}' does not exist")
-        return [], []
+        return [], [], []
     
     if not os.path.isdir(deepfake_folder):
         print(f"Error: Deepfake folder '{deepfake_folder}' does not exist")
-        return [], []
+        return [], [], []
     
     # Get all WAV files in both folders
-    bonafide_files = [os.path.join(bonafide_folder, f) for f in os.listdir(bonafide_folder) if f.endswith(".wav")]
-    deepfake_files = [os.path.join(deepfake_folder, f) for f in os.listdir(deepfake_folder) if f.endswith(".wav")]
+    bonafide_files = list_wav_files(bonafide_folder)
+    deepfake_files = list_wav_files(deepfake_folder)
     
     print(f"Found {len(bonafide_files)} bonafide files and {len(deepfake_files)} deepfake files")
     
-    # Initialize arrays for ground truth and predictions
-    y_true = []
-    y_pred = []
-    confidences = []
-    file_results = []
-    
-    # Process bonafide files
-    print("\nProcessing bonafide files...")
-    for file_path in bonafide_files:
-        result, confidence = process_audio_file(file_path)
-        if result is not None:  # Only include if processing was successful
-            y_true.append(0)  # 0 for bonafide (ground truth)
-            y_pred.append(1 if result else 0)  # 1 for spoofed, 0 for bonafide (prediction)
-            confidences.append(confidence)
-            file_results.append((os.path.basename(file_path), "bonafide", "spoofed" if result else "bonafide", confidence))
-    
-    # Process deepfake files
-    print("\nProcessing deepfake files...")
-    for file_path in deepfake_files:
-        result, confidence = process_audio_file(file_path)
-        if result is not None:  # Only include if processing was successful
-            y_true.append(1)  # 1 for spoofed (ground truth)
-            y_pred.append(1 if result else 0)  # 1 for spoofed, 0 for bonafide (prediction)
-            confidences.append(confidence)
-            file_results.append((os.path.basename(file_path), "deepfake", "spoofed" if result else "bonafide", confidence))
-    
-    # Print detailed results
-    print("\nDetailed Results:")
-    print("=" * 80)
-    print(f"{'Filename':<30} {'Ground Truth':<15} {'Prediction':<15} {'Confidence':<10}")
-    print("-" * 80)
-    for filename, truth, pred, conf in file_results:
-        print(f"{filename:<30} {truth:<15} {pred:<15} {conf:.4f}")
-    print("=" * 80)
-    
-    return np.array(y_true), np.array(y_pred), np.array(confidences)
+    file_paths = bonafide_files + deepfake_files
+    truth_names = ("bonafide", "deepfake")
+    
+    # Ground truth, preallocated: 0 for bonafide, 1 for spoofed
+    y_true = np.zeros(len(file_paths), dtype=np.int8)
+    y_true[len(bonafide_files):] = 1
+    
+    # Raw per-file posteriors, indexed by position in file_paths
+    # (NaN marks files that failed to process)
+    spoofed = np.full(len(file_paths), np.nan, dtype=np.float32)
+    bonafide = np.full(len(file_paths), np.nan, dtype=np.float32)
+    
+    print(f"\nProcessing {len(file_paths)} files with up to {concurrency} concurrent requests...")
+    async def process_file(session, file_path):
+        return await process_audio_file(session, file_path, refresh_cache)
+    
+    with open(results_file, "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(("filename", "ground_truth", "prediction", "confidence"))
+        
+        async for index, result in map_files_concurrently(process_file, file_paths, concurrency):
+            if result is None:
+                continue
+            spoofed[index], bonafide[index] = result
+            writer.writerow((
+                os.path.basename(file_paths[index]),
+                truth_names[y_true[index]],
+                "spoofed" if spoofed[index] > bonafide[index] else "bonafide",
+                f"{max(spoofed[index], bonafide[index]):.4f}"
+            ))
+    
+    print(f"\nResults saved in: {results_file}")
+    
+    # Only include files that were processed successfully
+    processed = ~np.isnan(spoofed)
+    spoofed, bonafide, y_true = spoofed[processed], bonafide[processed], y_true[processed]
+    
+    # Classify every file in one vectorized pass: 1 for spoofed, 0 for bonafide
+    y_pred = (spoofed > bonafide).astype(np.int8)
+    confidences = np.maximum(spoofed, bonafide)
+    
+    # Print detailed results, reading them back from the CSV file
+    # and writing the whole table at once
+    if verbose:
+        lines = [
+            "\nDetailed Results:",
+            "=" * 80,
+            f"{'Filename':<30} {'Ground Truth':<15} {'Prediction':<15} {'Confidence':<10}",
+            "-" * 80
+        ]
+        with open(results_file, newline="") as f:
+            reader = csv.reader(f)
+            next(reader)
+            lines.extend(f"{filename:<30} {truth:<15} {pred:<15} {conf}" for filename, truth, pred, conf in reader)
+        lines.append("=" * 80)
+        sys.stdout.write("\n".join(lines) + "\n")
+    
+    return y_true, y_pred, confidences
 
 def main():
     """Main function to parse arguments and evaluate deepfake detection."""
@@ -157,8 +204,31 @@ def main():
         required=True,
         help="Path to the folder containing bonafide and deepfake subfolders"
     )
+    parser.add_argument(
+        "--concurrency", "-c",
+        type=positive_int,
+        default=DEFAULT_CONCURRENCY,
+        help=f"Number of files to send to the API concurrently (default: {DEFAULT_CONCURRENCY})"
+    )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Ignore cached API results and re-process every file"
+    )
+    parser.add_argument(
+        "--output", "-o",
+        type=str,
+        default=DEFAULT_RESULTS_FILE,
+        help=f"CSV file to write the per-file results to (default: {DEFAULT_RESULTS_FILE})"
+    )
+    parser.add_argument(
+        "--verbose", "-v",
+        action="store_true",
+        help="Print the per-file results table and log per-file progress"
+    )
     
     args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO if args.verbose else logging.WARNING, format="%(message)s")
     
     if not args.input:
         parser.print_help()
@@ -168,14 +238,16 @@ def main():
     start_time = time.time()
     
     # Evaluate the folder
-    y_true, y_pred, confidences = evaluate_folder(args.input)
+    y_true, y_pred, confidences = asyncio.run(
+        evaluate_folder(args.input, args.concurrency, args.no_cache, args.output, args.verbose)
+    )
     
     if len(y_true) == 0 or len(y_pred) == 0:
         print("No results to evaluate")
         return
     
-    # Calculate confusion matrix
-    cm = confusion_matrix(y_true, y_pred)
+    # Calculate the binary confusion matrix: cell (true, predicted) is bin 2 * true + predicted
+    cm = np.bincount(2 * y_true.astype(np.int64) + y_pred.astype(np.int64), minlength=4).reshape(2, 2)
     
     # Print confusion matrix
     print("\nConfusion Matrix:")
@@ -4,44 +4,261 @@ Behavioral Signals API Client
 
 This script provides functionality to send audio files to the 
 Behavioral Signals API, process them, and save the results and extracted features.
+
+API calls are asynchronous (asyncio + aiohttp), so many files can wait on the
+API concurrently from a single thread.
 """
 
 # Standard library imports
 import os
-import json
+import sys
+import mmap
 import time
+import logging
+import asyncio
+import hashlib
+import tempfile
 import argparse
+from functools import lru_cache
 
 # Third-party imports
-import requests
+import aiohttp
+import orjson
 
 # Local imports
 import feature_extraction
 
 # Constants
 REALTIME_RATIO = 10
+DEFAULT_CONCURRENCY = 4
+POLL_MIN_DELAY = 0.1
+POLL_MAX_DELAY = 2.0
+POLL_BACKOFF = 1.5
+POLL_MAX_FAILURES = 5
+RESULTS_PREFETCH_PROGRESS = 0.9
+CONNECTION_LIMIT = 64
+REQUEST_TIMEOUT = 60
+GET_RETRIES = 3
+GET_RETRY_BACKOFF = 0.3
+HASH_CHUNK_SIZE = 1 << 22
+RETRY_STATUSES = (502, 503, 504)
 BASE_URL = "https://api.behavioralsignals.com/v5"
 CONFIG_FILE = "api.config"
+CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(CONFIG_FILE)), "_cache")
+PROGRESS_WIDTH = 50
+
+logger = logging.getLogger(__name__)
+
+@lru_cache(maxsize=1)
+def load_config():
+    """
+    Load the API credentials on first use and cache them.
+    
+    The BSI_PROJECT_ID and BSI_API_TOKEN environment variables take precedence
+    over the values in api.config; the file is not read if both are set.
+    
+    Returns:
+        dict: {"project_id": ..., "api_token": ...}
+    """
+    project_id = os.environ.get("BSI_PROJECT_ID")
+    api_token = os.environ.get("BSI_API_TOKEN")
+    
+    if project_id is None or api_token is None:
+        with open(CONFIG_FILE, "rb") as f:
+            config = orjson.loads(f.read())
+        project_id = project_id or config["project_id"]
+        api_token = api_token or config["api_token"]
+    
+    return {"project_id": project_id, "api_token": api_token}
+
+def api_url(path):
+    """
+    Build the URL of a project endpoint.
+    
+    Args:
+        path (str): Endpoint path below the project, e.g. "processes/audio"
+        
+    Returns:
+        str: Full endpoint URL
+    """
+    return f"{BASE_URL}/clients/{load_config()['project_id']}/{path}"
+
+def auth_headers():
+    """Return the authentication headers for API requests."""
+    return {"X-Auth-Token": load_config()["api_token"]}
 
-# Load configuration
-with open(CONFIG_FILE) as f:
-    config = json.load(f)
-    PROJECT_ID = config["project_id"]
-    API_TOKEN = config["api_token"]
+# Content digests keyed by (path, size, mtime), so unchanged files are hashed once per run
+_DIGEST_MEMO = {}
 
-# API endpoints
-UPLOAD_URL = f"{BASE_URL}/clients/{PROJECT_ID}/processes/audio"
+def file_digest(file_path):
+    """
+    Compute a content hash of a file, used as its cache key.
+    
+    The file is memory-mapped and hashed in 4 MB slices, so memory use stays flat
+    for large files and hashlib can run without the GIL in worker threads.
+    
+    Args:
+        file_path (str): Path to the file
+        
+    Returns:
+        str: Hex BLAKE2b digest of the file contents
+    """
+    stat = os.stat(file_path)
+    memo_key = (os.path.abspath(file_path), stat.st_size, stat.st_mtime_ns)
+    if memo_key in _DIGEST_MEMO:
+        return _DIGEST_MEMO[memo_key]
+    
+    digest = hashlib.blake2b(digest_size=16)
+    with open(file_path, "rb") as f:
+        # Empty files cannot be memory-mapped
+        if stat.st_size:
+            if hasattr(os, "posix_fadvise"):
+                os.posix_fadvise(f.fileno(), 0, 0, os.POSIX_FADV_SEQUENTIAL)
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                view = memoryview(mm)
+                try:
+                    for offset in range(0, len(mm), HASH_CHUNK_SIZE):
+                        digest.update(view[offset:offset + HASH_CHUNK_SIZE])
+                finally:
+                    view.release()
+    
+    _DIGEST_MEMO[memo_key] = digest.hexdigest()
+    return _DIGEST_MEMO[memo_key]
 
-# Request headers
-HEADERS = {
-    "X-Auth-Token": API_TOKEN
-}
+def load_cached_response(digest):
+    """
+    Load a cached API result.
+    
+    Args:
+        digest (str): Content hash of the audio file
+        
+    Returns:
+        tuple: (response_dict, audio_duration, processing_time) or None if not cached
+    """
+    try:
+        with open(os.path.join(CACHE_DIR, f"{digest}.json"), "rb") as f:
+            cached = orjson.loads(f.read())
+        return cached["response"], cached["audio_duration"], cached["processing_time"]
+    except (OSError, ValueError, KeyError):
+        return None
 
-def send_audio_file(file_path, file_name):
+def save_cached_response(digest, response, audio_duration, processing_time):
+    """
+    Atomically store an API result in the cache (temp file + rename).
+    
+    Args:
+        digest (str): Content hash of the audio file
+        response (dict): API results
+        audio_duration (float): Audio duration in seconds
+        processing_time (float): Processing time in seconds
+    """
+    try:
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=CACHE_DIR, suffix=".tmp")
+        with os.fdopen(fd, "wb") as f:
+            f.write(orjson.dumps({
+                "response": response,
+                "audio_duration": audio_duration,
+                "processing_time": processing_time
+            }))
+        os.replace(tmp_path, os.path.join(CACHE_DIR, f"{digest}.json"))
+    except OSError as e:
+        logger.warning("Failed to cache result: %s", e)
+
+def list_wav_files(folder):
+    """
+    List the .wav files directly inside a folder.
+    
+    Uses os.scandir, whose entries already carry the file type, so no extra
+    stat call is needed per file (only symlinks are resolved).
+    
+    Args:
+        folder (str): Folder to scan
+        
+    Returns:
+        list: Paths of the .wav files in the folder
+    """
+    with os.scandir(folder) as entries:
+        return [
+            entry.path for entry in entries
+            if entry.is_file() and entry.name.endswith(".wav")
+        ]
+
+def show_progress(message):
+    """
+    Overwrite the current terminal line with a progress message.
+    
+    Only shown on an interactive terminal with info logging enabled, so batch
+    runs with redirected output are not flooded with carriage returns.
+    
+    Args:
+        message (str): Progress message, or "" to clear the line
+    """
+    if sys.stdout.isatty() and logger.isEnabledFor(logging.INFO):
+        sys.stdout.write(f"\r{message:<{PROGRESS_WIDTH}}\r")
+        sys.stdout.flush()
+
+def create_session():
+    """
+    Create the HTTP session shared by all API calls of a run.
+    
+    Must be called from a running event loop; use it as an async context manager.
+    Requests have no overall time limit (large uploads can take a long time), only
+    connect and read timeouts that catch a stalled connection.
+    
+    Returns:
+        aiohttp.ClientSession: Keep-alive session with authentication headers
+    """
+    return aiohttp.ClientSession(
+        headers=auth_headers(),
+        connector=aiohttp.TCPConnector(limit=CONNECTION_LIMIT),
+        timeout=aiohttp.ClientTimeout(total=None, sock_connect=REQUEST_TIMEOUT, sock_read=REQUEST_TIMEOUT)
+    )
+
+async def get_json(session, url):
+    """
+    GET a JSON endpoint, retrying gateway errors with exponential backoff.
+    
+    Args:
+        session (aiohttp.ClientSession): Session to use
+        url (str): Endpoint URL
+        
+    Returns:
+        dict: Decoded JSON response
+        
+    Raises:
+        aiohttp.ClientError: If the request fails or returns an error status
+    """
+    for attempt in range(GET_RETRIES + 1):
+        async with session.get(url) as response:
+            if response.status in RETRY_STATUSES and attempt < GET_RETRIES:
+                await asyncio.sleep(GET_RETRY_BACKOFF * 2 ** attempt)
+                continue
+            response.raise_for_status()
+            return orjson.loads(await response.read())
+
+async def get_json_or_none(session, url):
+    """
+    GET a JSON endpoint like get_json, but return None instead of raising on failure.
+    
+    Args:
+        session (aiohttp.ClientSession): Session to use
+        url (str): Endpoint URL
+        
+    Returns:
+        dict: Decoded JSON response, or None if the request failed
+    """
+    try:
+        return await get_json(session, url)
+    except (aiohttp.ClientError, asyncio.TimeoutError, ValueError):
+        return None
+
+async def send_audio_file(session, file_path, file_name):
     """
     Upload an audio file to the API.
     
     Args:
+        session (aiohttp.ClientSession): Session to use
         file_path (str): Path to the audio file
         file_name (str): Name to use for the uploaded file
         
@@ -50,27 +267,33 @@ def send_audio_file(file_path, file_name):
     """
     try:
         with open(file_path, "rb") as audio_file:
-            files = {
-                "file": audio_file,
-                "name": (None, file_name)
-            }
-            response = requests.post(UPLOAD_URL, headers=HEADERS, files=files)
-        
-        response.raise_for_status()
-        print("Upload successful!")
-        return response.json()
-    except requests.exceptions.RequestException as e:
-        print(f"Failed to upload: {e}")
-        if hasattr(e, 'response') and e.response:
-            print(f"Status code: {e.response.status_code}")
-            print(f"Error message: {e.response.text}")
+            # aiohttp streams file fields in chunks instead of buffering the whole file
+            form = aiohttp.FormData()
+            form.add_field("file", audio_file, filename=os.path.basename(file_path), content_type="audio/wav")
+            form.add_field("name", file_name)
+            
+            # No read timeout while the file is still being sent
+            upload_timeout = aiohttp.ClientTimeout(total=None, sock_connect=REQUEST_TIMEOUT)
+            async with session.post(api_url("processes/audio"), data=form, timeout=upload_timeout) as response:
+                body = await response.read()
+        
+        if response.status >= 400:
+            logger.error("Failed to upload %s: %s %s", file_path, response.status, response.reason)
+            logger.error("Error message: %s", body.decode(errors="replace"))
+            return None
+        
+        logger.debug("Uploaded %s", file_path)
+        return orjson.loads(body)
+    except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+        logger.error("Failed to upload %s: %s", file_path, e)
         return None
 
-def check_process(process_id, client_id):
+async def check_process(session, process_id, client_id):
     """
     Check the status of a processing job.
     
     Args:
+        session (aiohttp.ClientSession): Session to use
         process_id (str): Process ID to check
         client_id (str): Client ID
         
@@ -78,32 +301,68 @@ def check_process(process_id, client_id):
         dict: JSON response with process status
     """
     process_url = f"{BASE_URL}/clients/{client_id}/processes/{process_id}"
-    response = requests.get(process_url, headers=HEADERS)
-    return response.json()
+    return await get_json(session, process_url)
 
 
-def send_audio_and_get_response(file_path, file_name):
+async def send_audio_and_get_response(session, file_path, file_name, refresh_cache=False):
     """
     Send an audio file to the API, monitor processing, and get results.
     
+    Results are cached on disk by file content, so unchanged files are not re-processed.
+    
     Args:
+        session (aiohttp.ClientSession): Session to use
         file_path (str): Path to the audio file
         file_name (str): Name to use for the uploaded file
+        refresh_cache (bool): Ignore any cached result and re-process the file
         
     Returns:
         tuple: (response_dict, audio_duration, processing_time) or (None, 0, 0) if processing failed
     """
-    print("Sending audio file to API...")
-    upload_response = send_audio_file(file_path, file_name)
+    # Hash off the event loop so other files keep making progress
+    digest = await asyncio.to_thread(file_digest, file_path)
+    if not refresh_cache:
+        cached = load_cached_response(digest)
+        if cached:
+            logger.info("Using cached result for %s", file_path)
+            return cached
+    
+    logger.debug("Sending %s to API...", file_path)
+    upload_response = await send_audio_file(session, file_path, file_name)
     
     if not upload_response:
         return None, 0, 0
     
-    print("Processing audio file:")
     start_time = time.time()
     
+    results_url = api_url(f"processes/{upload_response['pid']}/results")
+    prefetch_results = False
+    delay = POLL_MIN_DELAY
+    slept_for_estimate = False
+    failures = 0
+    
     while True:
-        process_response = check_process(upload_response["pid"], PROJECT_ID)
+        speculative_results = None
+        try:
+            poll = check_process(session, upload_response["pid"], load_config()["project_id"])
+            if prefetch_results:
+                # Request the results together with the status, saving a round trip
+                # when this poll turns out to be the one that reports completion
+                process_response, speculative_results = await asyncio.gather(
+                    poll, get_json_or_none(session, results_url)
+                )
+            else:
+                process_response = await poll
+            failures = 0
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            # 4xx (bad token, unknown pid) never recovers, other errors are retried a few times
+            failures += 1
+            client_error = isinstance(e, aiohttp.ClientResponseError) and e.status < 500
+            if client_error or failures >= POLL_MAX_FAILURES:
+                logger.error("Polling failed for %s (%s), giving up", file_path, e)
+                return None, 0, 0
+            logger.warning("Polling failed (%s), retrying...", e)
+            process_response = {"status": None}
         
         # Status 2 means processing is complete
         if process_response["status"] == 2:
@@ -116,61 +375,177 @@ def send_audio_and_get_response(file_path, file_name):
             
             # Calculate progress percentage
             percentage_processed = min(1.0, elapsed * REALTIME_RATIO / duration)
-            print(f"Please wait... {100 * percentage_processed:.1f}% completed", end="\r")
-        elif process_response["status"] == 0: # API busy with another job:
-            print("API is busy, waiting...")
+            show_progress(f"Please wait... {100 * percentage_processed:.1f}% completed")
+            
+            # Close to the expected finish, fetch the results alongside each poll
+            prefetch_results = percentage_processed >= RESULTS_PREFETCH_PROGRESS
             
-        time.sleep(0.5)
+            # Once the duration is known, sleep until shortly before the expected finish
+            if not slept_for_estimate:
+                slept_for_estimate = True
+                expected = max(0.2, duration / REALTIME_RATIO)
+                await asyncio.sleep(max(0.0, expected * 0.8 - elapsed))
+                continue
+        elif process_response["status"] == 0: # API busy with another job:
+            logger.info("API is busy, waiting...")
+        
+        # Back off between polls that find the job still running
+        await asyncio.sleep(delay)
+        delay = min(delay * POLL_BACKOFF, POLL_MAX_DELAY)
     
     end_time = time.time()
     processing_time = end_time - start_time
     duration = process_response["duration"]
     
-    print("DONE                                              ")
-    print(f"Audio duration: {duration:.1f} seconds")
-    print(f"Processing took {processing_time:.1f} seconds")
-    
-    realtime_ratio = duration / processing_time
-    print(f"Real-time ratio: {realtime_ratio:.1f}")
+    show_progress("")
+    logger.info(
+        "Processed %s: %.1f seconds of audio in %.1f seconds (real-time ratio: %.1f)",
+        file_path, duration, processing_time, duration / processing_time
+    )
 
-    # Get the results
-    results_url = f"{BASE_URL}/clients/{PROJECT_ID}/processes/{process_response['pid']}/results"
-    results_response = requests.get(results_url, headers=HEADERS)
+    # Get the results, unless they came back with the poll that reported completion
+    try:
+        if speculative_results and speculative_results.get("results"):
+            response_json = speculative_results
+        else:
+            response_json = await get_json(session, results_url)
+    except (aiohttp.ClientError, asyncio.TimeoutError, ValueError) as e:
+        logger.error("Failed to fetch results for %s: %s", file_path, e)
+        return None, 0, 0
     
-    response_json = results_response.json()
+    # Only cache complete results, never an error or empty body
+    if not isinstance(response_json, dict) or "results" not in response_json:
+        logger.error("No results returned for %s", file_path)
+        return None, 0, 0
+    
+    save_cached_response(digest, response_json, duration, processing_time)
     
     return response_json, duration, processing_time
 
-def send_audio_and_save_response(file_path):
+def save_response(file_path, response):
     """
-    Send an audio file to the API, get results, and save them to JSON files.
+    Save the API results of an audio file and the extracted features to JSON files.
     
     Args:
         file_path (str): Path to the audio file
-        
-    Returns:
-        tuple: (response_dict, audio_duration, processing_time) or (None, 0, 0) if processing failed
+        response (dict): API results for the file
     """
-    response, audio_duration, processing_time = send_audio_and_get_response(file_path, os.path.basename(file_path))
-    
-    if not response:
-        print(f"Failed to process {file_path}")
-        return None, 0, 0
-    
     # Save raw API response
     json_file = file_path.replace(".wav", ".json")
-    with open(json_file, "w") as f:
-        json.dump(response, f, indent=4)
-    print(f"Results saved in: {json_file}")
+    with open(json_file, "wb") as f:
+        f.write(orjson.dumps(response, option=orjson.OPT_INDENT_2))
+    logger.info("Results saved in: %s", json_file)
     
     # Extract and save features
     features_json = feature_extraction.extract_segment_features(response)
     json_features_file = file_path.replace(".wav", "_features.json")
-    with open(json_features_file, "w") as f:
-        json.dump(features_json, f, indent=4, ensure_ascii=False)
-    print(f"Features saved in: {json_features_file}")
+    with open(json_features_file, "wb") as f:
+        f.write(orjson.dumps(features_json, option=orjson.OPT_INDENT_2))
+    logger.info("Features saved in: %s", json_features_file)
+
+async def map_files_concurrently(process_file, file_paths, concurrency):
+    """
+    Run process_file(session, file_path) for every file over one shared session.
+    
+    At most `concurrency` files are in flight at once (a semaphore), which keeps
+    the load on the API bounded. Files with identical content are processed once
+    and the result is yielded for each of them.
+    
+    Args:
+        process_file: Coroutine function taking (session, file_path)
+        file_paths (list): Files to process
+        concurrency (int): Maximum number of files processed at the same time
+        
+    Yields:
+        tuple: (index, result) for each file, in completion order, where index is
+               the file's position in file_paths
+    """
+    # Hash every file up front (in worker threads) and group identical content
+    digests = await asyncio.gather(*(asyncio.to_thread(file_digest, p) for p in file_paths))
+    groups = {}
+    for index, digest in enumerate(digests):
+        groups.setdefault(digest, []).append(index)
+    
+    if len(groups) < len(file_paths):
+        logger.info("Skipping %d duplicate files (same content as another file)", len(file_paths) - len(groups))
+    
+    semaphore = asyncio.Semaphore(concurrency)
+    
+    async with create_session() as session:
+        async def run(indices):
+            async with semaphore:
+                return indices, await process_file(session, file_paths[indices[0]])
+        
+        for next_done in asyncio.as_completed([run(indices) for indices in groups.values()]):
+            indices, result = await next_done
+            for index in indices:
+                yield index, result
+
+async def process_files(file_paths, concurrency, refresh_cache):
+    """
+    Send files to the API concurrently and save their results.
+    
+    Args:
+        file_paths (list): Paths of the audio files
+        concurrency (int): Maximum number of files processed at the same time
+        refresh_cache (bool): Ignore cached results and re-process every file
+        
+    Returns:
+        tuple: (total_audio_duration, total_processing_time, cached_files), where the
+               totals only cover files processed by the API in this run and cached_files
+               counts the files whose result came from the cache
+    """
+    totals = {"audio_duration": 0.0, "processing_time": 0.0, "cached_files": 0}
     
-    return response, audio_duration, processing_time
+    # Runs once per unique file content, so duplicates do not inflate the totals
+    async def process_file(session, file_path):
+        logger.info("Processing: %s", file_path)
+        if not refresh_cache:
+            cached = load_cached_response(await asyncio.to_thread(file_digest, file_path))
+            if cached:
+                logger.info("Using cached result for %s", file_path)
+                totals["cached_files"] += 1
+                return cached
+        
+        # The cache was checked above, so go straight to the API
+        result = await send_audio_and_get_response(session, file_path, os.path.basename(file_path), refresh_cache=True)
+        response, audio_duration, processing_time = result
+        if response:
+            totals["audio_duration"] += audio_duration
+            totals["processing_time"] += processing_time
+        return result
+    
+    async for index, (response, _, _) in map_files_concurrently(process_file, file_paths, concurrency):
+        if not response:
+            logger.error("Failed to process %s", file_paths[index])
+            continue
+        
+        # Duplicate files share one result, so save it next to each of them
+        save_response(file_paths[index], response)
+    
+    return totals["audio_duration"], totals["processing_time"], totals["cached_files"]
+
+def positive_int(value):
+    """
+    argparse type for options that must be at least 1 (e.g. --concurrency).
+    
+    Args:
+        value (str): Command-line value
+        
+    Returns:
+        int: The parsed value
+        
+    Raises:
+        argparse.ArgumentTypeError: If the value is not an integer of at least 1
+    """
+    try:
+        number = int(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid int value: '{value}'")
+    if number < 1:
+        raise argparse.ArgumentTypeError(f"must be at least 1, got {number}")
+    return number
+
 def main():
     """Main function to parse arguments and process audio files."""
     parser = argparse.ArgumentParser(
@@ -182,8 +557,25 @@ def main():
         required=True,
         help="Path to the audio file or folder with audio files"
     )
+    parser.add_argument(
+        "--concurrency", "-c",
+        type=positive_int,
+        default=DEFAULT_CONCURRENCY,
+        help=f"Number of files to send to the API concurrently (default: {DEFAULT_CONCURRENCY})"
+    )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Ignore cached API results and re-process every file"
+    )
+    parser.add_argument(
+        "--verbose", "-v",
+        action="store_true",
+        help="Log per-file progress (only warnings and errors are shown otherwise)"
+    )
     
     args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO if args.verbose else logging.WARNING, format="%(message)s")
     
     if not args.input:
         parser.print_help()
@@ -194,10 +586,10 @@ def main():
         if not args.input.endswith(".wav"):
             print("Error: Input file must be a .wav file")
             return
-        send_audio_and_save_response(args.input)
+        asyncio.run(process_files([args.input], 1, args.no_cache))
     elif os.path.isdir(args.input):
         # Process all .wav files in a directory
-        wav_files = [f for f in os.listdir(args.input) if f.endswith(".wav")]
+        wav_files = list_wav_files(args.input)
         
         if not wav_files:
             print(f"No .wav files found in {args.input}")
@@ -207,36 +599,28 @@ def main():
         
         # Track total processing time and audio duration
         total_start_time = time.time()
-        total_audio_duration = 0.0
-        total_processing_time_excluding_upload = 0.0
-        
-        for file in wav_files:
-            file_path = os.path.join(args.input, file)
-            print(f"\nProcessing: {file_path}")
-            response, audio_duration, processing_time = send_audio_and_save_response(file_path)
-            
-            # Accumulate totals if processing was successful
-            if response:
-                total_audio_duration += audio_duration
-                total_processing_time_excluding_upload += processing_time
+        total_audio_duration, summed_processing_time, cached_files = asyncio.run(
+            process_files(wav_files, args.concurrency, args.no_cache)
+        )
         
         # Calculate total processing time including upload
         total_end_time = time.time()
-        total_processing_time_including_upload = total_end_time - total_start_time
+        wall_clock_time = total_end_time - total_start_time
         
         # Print comprehensive statistics
         print(f"\n{'='*60}")
         print(f"BATCH PROCESSING SUMMARY:")
         print(f"Total files processed: {len(wav_files)}")
+        print(f"Results reused from cache: {cached_files} (not counted below)")
         print(f"Total audio duration: {total_audio_duration:.1f} seconds")
-        print(f"Total processing time (excluding upload): {total_processing_time_excluding_upload:.1f} seconds")
-        print(f"Total processing time (including upload): {total_processing_time_including_upload:.1f} seconds")
+        # Files run concurrently, so per-file processing times overlap and their sum can
+        # exceed the wall-clock time; only the wall-clock time gives a real-time ratio
+        print(f"Summed per-file processing time (excluding upload): {summed_processing_time:.1f} seconds")
+        print(f"Wall-clock time (including upload): {wall_clock_time:.1f} seconds")
         
         if total_audio_duration > 0:
-            realtime_ratio_excluding_upload = total_audio_duration / total_processing_time_excluding_upload
-            realtime_ratio_including_upload = total_audio_duration / total_processing_time_including_upload
-            print(f"Real-time ratio (excluding upload): {realtime_ratio_excluding_upload:.1f}")
-            print(f"Real-time ratio (including upload): {realtime_ratio_including_upload:.1f}")
+            realtime_ratio = total_audio_duration / wall_clock_time
+            print(f"Real-time ratio (wall-clock, including upload): {realtime_ratio:.1f}")
         print(f"{'='*60}")
     else:
         print(f"Error: Invalid input path '{args.input}'")